@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import sys
+import threading
+import traceback
+from config import AGENT_PORT, AGENT_HOST, FLEET_TOKEN, SIMULATE_SHUTDOWN
+from scheduler import _timer_fired, _run_shutdown_command
+
+# ---------- Headless app ----------
+class _StatusLine:
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def configure(self, text=""):
+        print(f"{self.prefix} {text}")
+
+
+class HeadlessApp:
+    """Minimal stand-in for SchedulerApp so _timer_fired can run without a window."""
+
+    def __init__(self, name="agent", simulate=False, token=FLEET_TOKEN):
+        self.name = name
+        self.simulate = simulate
+        self.token = token
+        self.schedules = {}
+        self.timers = {}
+        self.storage_file = None  # the controller owns persistence
+        self.status = _StatusLine(f"[Agent {name}]")
+        self.executed = []
+        self.accepted = set()  # (id, when) already fired, so a resent request does not shut down twice
+        self._lock = threading.Lock()
+
+    def after(self, ms, func):
+        # no Tk loop here, run UI callbacks inline
+        func()
+
+    def refresh_list_for_selected_day(self):
+        pass
+
+    def show_warning(self, title, text):
+        print(f"[Agent {self.name}] {title}: {text}")
+
+    def perform_shutdown(self, sid, label, when):
+        with self._lock:
+            self.executed.append((sid, when))
+        # never the Tk messagebox path of _perform_shutdown, an agent has no window
+        if self.simulate or SIMULATE_SHUTDOWN:
+            print(f"[Agent {self.name}] Simulated shutdown {sid[:8]} — {label}")
+        else:
+            _run_shutdown_command()
+
+
+# ---------- Agent server ----------
+def _check_request(app, msg):
+    """Return an error string for a request the agent must refuse, else None."""
+    if not isinstance(msg, dict):
+        return "request must be a JSON object"
+    if app.token and not hmac.compare_digest(str(msg.get("token", "")).encode("utf-8"), app.token.encode("utf-8")):
+        return "invalid token"
+    op = msg.get("op")
+    if op == "fire":
+        if not isinstance(msg.get("id"), str) or not msg["id"]:
+            return "fire needs a schedule id"
+    elif op != "ping":
+        return f"unknown op {op!r}"
+    return None
+
+
+def _log_failure(app, sid, future):
+    # the executor swallows exceptions unless someone asks for them
+    if future.cancelled() or future.exception() is None:
+        return
+    error = future.exception()
+    print(f"[Agent {app.name}] Shutdown {sid[:8]} failed: {error!r}")
+    traceback.print_exception(type(error), error, error.__traceback__)
+
+
+async def _handle_connection(app, reader, writer):
+    # one persistent connection per controller, newline-delimited JSON requests
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                msg = None
+                error = "invalid json"
+            else:
+                error = _check_request(app, msg)
+            run_sid = None
+            if error:
+                reply = {"ok": False, "error": error}
+            elif msg["op"] == "ping":
+                reply = {"ok": True, "executed": len(app.executed)}
+            else:
+                sid = msg["id"]
+                when = str(msg.get("when", ""))
+                reply = {"ok": True}
+                with app._lock:
+                    if (sid, when) in app.accepted:
+                        reply["duplicate"] = True
+                    else:
+                        app.accepted.add((sid, when))
+                        app.schedules[sid] = {
+                            "id": sid,
+                            "when": when,
+                            "label": str(msg.get("label", "")),
+                            "enabled": True,
+                            "repeat": False,  # repeats are tracked by the controller
+                            "repeat_days": []
+                        }
+                        run_sid = sid
+            # acknowledge before acting, a real shutdown would never get to reply
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+            if run_sid:
+                future = loop.run_in_executor(None, _timer_fired, app, run_sid)
+                future.add_done_callback(lambda f, sid=run_sid: _log_failure(app, sid, f))
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def _is_loopback(host):
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+async def _start_agent(app, host, port):
+    if not _is_loopback(host) and not app.token:
+        raise ValueError("Refusing to listen on a non-loopback address without FLEET_TOKEN set.")
+    return await asyncio.start_server(lambda r, w: _handle_connection(app, r, w), host, port)
+
+
+async def serve_agent(app, host=AGENT_HOST, port=AGENT_PORT):
+    server = await _start_agent(app, host, port)
+    print(f"[Agent {app.name}] Listening on {host}:{port}")
+    return server
+
+
+def local_addresses(count, base_port=AGENT_PORT, host="127.0.0.1"):
+    return [f"{host}:{base_port + i}" for i in range(count)]
+
+
+async def run_local_agents(count, base_port=AGENT_PORT, host="127.0.0.1", token=FLEET_TOKEN):
+    """
+    Stand-in fleet: one simulated agent per port on this box. base_port=0 picks
+    free ports. Returns (server, app) pairs.
+    """
+    agents = []
+    for i in range(count):
+        app = HeadlessApp(name=f"local-{i}", simulate=True, token=token)
+        server = await _start_agent(app, host, base_port + i if base_port else 0)
+        agents.append((server, app))
+    print(f"[Agent] {count} local agents listening on {host}")
+    return agents
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="agent", description="Receive shutdown actions from a fleet controller.")
+    parser.add_argument("--host", default=AGENT_HOST, help="address to listen on; non-loopback needs FLEET_TOKEN")
+    parser.add_argument("--port", type=int, default=AGENT_PORT)
+    parser.add_argument("--simulate", action="store_true", help="log actions instead of shutting down")
+    parser.add_argument("--local", type=int, metavar="N", help="run N simulated agents on consecutive ports")
+    args = parser.parse_args(argv)
+
+    async def _run():
+        if args.local:
+            agents = await run_local_agents(args.local, args.port, args.host)
+            servers = [server for server, _ in agents]
+        else:
+            servers = [await serve_agent(HeadlessApp(simulate=args.simulate), args.host, args.port)]
+        await asyncio.gather(*(s.serve_forever() for s in servers))
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,74 @@
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+# ---------- Clocks ----------
+class SystemClock:
+    """Wall-clock time and real threading timers (what the app normally uses)."""
+
+    def now(self):
+        return datetime.now()
+
+    def call_later(self, delay, func, *args):
+        timer = threading.Timer(delay, func, args=args)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+
+class _VirtualTimer:
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualClock:
+    """Clock that only moves when run_until() is called; timers fire in due order."""
+
+    def __init__(self, start):
+        self._now = start
+        self._queue = []
+        self._seq = 0
+
+    def now(self):
+        return self._now
+
+    def call_later(self, delay, func, *args):
+        timer = _VirtualTimer(func, args)
+        self._seq += 1
+        heapq.heappush(self._queue, (self._now + timedelta(seconds=delay), self._seq, timer))
+        return timer
+
+    def run_until(self, end):
+        """Fire every pending timer due before end, then leave the clock at end. Returns the number fired."""
+        fired = 0
+        queue = self._queue
+        while queue and queue[0][0] < end:
+            due, _, timer = heapq.heappop(queue)
+            if timer.cancelled:
+                continue
+            self._now = max(self._now, due)
+            timer.func(*timer.args)
+            fired += 1
+        self._now = max(self._now, end)
+        return fired
+
+
+_clock = SystemClock()
+
+def now():
+    return _clock.now()
+
+def call_later(delay, func, *args):
+    return _clock.call_later(delay, func, *args)
+
+def set_clock(clock):
+    """Install clock for the scheduler and UI. Returns the previous one so it can be restored."""
+    global _clock
+    previous = _clock
+    _clock = clock
+    return previous
@@ -7,4 +7,14 @@ os.makedirs(os.path.dirname(SAVE_PATH), exist_ok=True)
 STORAGE_FILE = SAVE_PATH
 CONFIG_FILE = os.path.join(os.path.dirname(SAVE_PATH), "config.json")
 SIMULATE_SHUTDOWN = False  # Set to False for real shutdowns (⚠️)
+# Fleet controller / agent
+FLEET_FILE = os.path.join(os.path.dirname(SAVE_PATH), "fleet_schedules.json")
+AGENT_PORT = 48650
+AGENT_HOST = "127.0.0.1"  # agents only listen locally unless --host is given
+# Shared secret the controller sends with every request; agents refuse to bind
+# to a non-loopback address without one.
+FLEET_TOKEN = os.getenv("SHUTDOWN_SCHEDULER_FLEET_TOKEN", "")
+FLEET_MAX_CONCURRENCY = 256  # max in-flight agent requests during a wave
+FLEET_TIMEOUT = 10.0  # seconds per connect / request
+FLEET_POLL_INTERVAL = 1.0  # seconds between checks of the fleet file for new schedules
 # ----------------------------
\ No newline at end of file
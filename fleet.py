@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from config import FLEET_FILE, AGENT_PORT, FLEET_MAX_CONCURRENCY, FLEET_TIMEOUT, FLEET_TOKEN, FLEET_POLL_INTERVAL
+from persistence import load_schedules, save_schedules
+from scheduler import _calculate_next_occurrence
+import clock
+
+def parse_address(address):
+    """Split "host[:port]" into (host, port), using AGENT_PORT when no port is given."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return address, AGENT_PORT
+
+
+# ---------- Connection pool ----------
+class AgentPool:
+    """Persistent connections to agents, one per address, reused across dispatches."""
+
+    def __init__(self, timeout=FLEET_TIMEOUT):
+        self.timeout = timeout
+        self._conns = {}
+        self._locks = {}
+
+    async def request(self, address, message):
+        # requests on one connection are serialized; different agents run in parallel
+        lock = self._locks.setdefault(address, asyncio.Lock())
+        async with lock:
+            for attempt in range(2):
+                written = False
+                try:
+                    conn = self._conns.get(address)
+                    if conn is not None and (conn[0].at_eof() or conn[1].is_closing()):
+                        # agent went away since the last request
+                        self._drop(address)
+                        conn = None
+                    if conn is None:
+                        host, port = parse_address(address)
+                        conn = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+                        self._conns[address] = conn
+                    reader, writer = conn
+                    written = True
+                    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                    await writer.drain()
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionError("agent closed the connection")
+                    return json.loads(line)
+                except asyncio.TimeoutError:
+                    self._drop(address)
+                    raise
+                except (OSError, ConnectionError):
+                    self._drop(address)
+                    # once the request may have reached the agent, resending could run it twice
+                    if attempt or written:
+                        raise
+
+    def _drop(self, address):
+        conn = self._conns.pop(address, None)
+        if conn:
+            conn[1].close()
+
+    async def close(self):
+        for address in list(self._conns):
+            self._drop(address)
+
+
+# ---------- Controller ----------
+class _StatusLine:
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+
+    def configure(self, text=""):
+        if not self.quiet:
+            print(f"[Fleet] {text}")
+
+
+class FleetController:
+    def __init__(self, storage_file=FLEET_FILE, max_concurrency=FLEET_MAX_CONCURRENCY, timeout=FLEET_TIMEOUT, token=FLEET_TOKEN):
+        self.storage_file = storage_file
+        self.schedules = {}
+        self.pool = AgentPool(timeout)
+        self.max_concurrency = max_concurrency
+        self.token = token
+        self.status = _StatusLine()
+        self._removed = set()  # ids finished here, so a merge does not bring them back
+        self._disk_stamp = None  # (mtime, size) of the file when it was last read or written
+        self._sem = None
+
+    def show_warning(self, title, text):
+        print(f"[Fleet] {title}: {text}")
+
+    def load(self):
+        self.schedules = {}
+        load_schedules(self, keep_fields=("hosts",))
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.storage_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _merge_from_disk(self):
+        # pick up schedules added by "controller add" while this one is running
+        self._disk_stamp = self._file_stamp()
+        disk = FleetController(self.storage_file)
+        disk.status = _StatusLine(quiet=True)
+        disk.load()
+        now = clock.now()
+        added = dropped = 0
+        for sid, info in disk.schedules.items():
+            if sid in self.schedules or sid in self._removed:
+                continue
+            self.schedules[sid] = info
+            if info.get("enabled", True):
+                self._skip_past(sid, now)
+            if sid in self.schedules:
+                added += 1
+            else:
+                dropped += 1
+        if added:
+            print(f"[Fleet] Picked up {added} new schedule(s) from {self.storage_file}")
+        if dropped:
+            print(f"[Fleet] Dropped {dropped} new one-time schedule(s) that were already in the past")
+
+    def save(self):
+        self._merge_from_disk()
+        save_schedules(self)
+        self._disk_stamp = self._file_stamp()
+
+    def add_schedule(self, iso_when, hosts, label="Scheduled shutdown", repeat=False, repeat_days=None):
+        sid = str(uuid.uuid4())
+        self.schedules[sid] = {
+            "id": sid,
+            "when": iso_when,
+            "label": label,
+            "enabled": True,
+            "repeat": repeat,
+            "repeat_days": repeat_days or [],
+            "hosts": list(hosts)
+        }
+        self.save()
+        return sid
+
+    def _all_hosts(self):
+        hosts = set()
+        for info in self.schedules.values():
+            hosts.update(info.get("hosts", []))
+        return sorted(hosts)
+
+    async def _send(self, address, message):
+        async with self._sem:
+            try:
+                reply = await self.pool.request(address, message)
+            except (OSError, ConnectionError, asyncio.TimeoutError, ValueError) as e:
+                return f"{type(e).__name__}: {e}"
+            if not reply.get("ok"):
+                return reply.get("error", "rejected")
+            return None
+
+    async def warm_up(self, hosts=None):
+        """Open pooled connections ahead of time so a wave only pays for the request."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        hosts = self._all_hosts() if hosts is None else hosts
+        errors = await asyncio.gather(*(self._send(h, {"op": "ping", "token": self.token}) for h in hosts))
+        failed = sum(1 for e in errors if e)
+        print(f"[Fleet] Connected to {len(hosts) - failed}/{len(hosts)} agents.")
+        return dict(zip(hosts, errors))
+
+    async def dispatch(self, sid):
+        """Send the shutdown for schedule sid to all of its hosts. Returns {host: error or None}."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        info = self.schedules.get(sid)
+        if not info:
+            return {}
+        hosts = info.get("hosts", [])
+        message = {"op": "fire", "id": sid, "when": info["when"], "label": info.get("label", ""), "token": self.token}
+        start = time.perf_counter()
+        errors = await asyncio.gather(*(self._send(h, message) for h in hosts))
+        results = dict(zip(hosts, errors))
+        failed = [h for h, e in results.items() if e]
+        print(f"[Fleet] Dispatched {sid[:8]} to {len(hosts) - len(failed)}/{len(hosts)} hosts in {time.perf_counter() - start:.2f}s")
+        for h in failed[:10]:
+            print(f"[Fleet]   {h}: {results[h]}")
+        if len(failed) > 10:
+            print(f"[Fleet]   ... and {len(failed) - 10} more")
+        return results
+
+    def _advance(self, sid):
+        # same repeat rules as the local scheduler
+        info = self.schedules[sid]
+        if info.get("repeat", False):
+            next_dt = _calculate_next_occurrence(datetime.fromisoformat(info["when"]), info.get("repeat_days", []))
+            if next_dt:
+                info["when"] = next_dt.isoformat()
+                return
+        del self.schedules[sid]
+        self._removed.add(sid)
+
+    def _skip_past(self, sid, now):
+        # a past one-shot is dropped and a past repeat moves to its first occurrence after now
+        while sid in self.schedules and datetime.fromisoformat(self.schedules[sid]["when"]) <= now:
+            self._advance(sid)
+
+    def restore(self):
+        # unlike restore_timers, missed occurrences are skipped rather than caught up:
+        # a controller that was down should not shut the whole fleet down on start
+        now = clock.now()
+        for sid, info in list(self.schedules.items()):
+            if info.get("enabled", True):
+                self._skip_past(sid, now)
+        self.save()
+
+    async def tick(self):
+        """Dispatch everything that is due. Returns how long to sleep before the next tick."""
+        if self._file_stamp() != self._disk_stamp:
+            self._merge_from_disk()
+        now = clock.now()
+        due = []
+        next_dt = None
+        for sid, info in self.schedules.items():
+            if not info.get("enabled", True):
+                continue
+            dt = datetime.fromisoformat(info["when"])
+            if dt <= now:
+                due.append(sid)
+            elif next_dt is None or dt < next_dt:
+                next_dt = dt
+        if due:
+            # every schedule in the wave shares the same concurrency bound
+            await asyncio.gather(*(self.dispatch(sid) for sid in due))
+            # one wave per schedule, then move past now as restore() does, so a controller
+            # that fell behind (suspend, clock jump) does not send one wave per missed day
+            now = clock.now()
+            for sid in due:
+                self._skip_past(sid, now)
+            self.save()
+            return 0
+        # wake up for the next fire, or sooner to notice schedules added on disk
+        if next_dt is None:
+            return FLEET_POLL_INTERVAL
+        return max(min(FLEET_POLL_INTERVAL, (next_dt - now).total_seconds()), 0.01)
+
+    async def run(self):
+        self.restore()
+        await self.warm_up()
+        print(f"[Fleet] Controller running with {len(self.schedules)} schedule(s).")
+        try:
+            while True:
+                delay = await self.tick()
+                if delay:
+                    await asyncio.sleep(delay)
+        finally:
+            await self.pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="controller", description="Own shutdown schedules for many hosts and dispatch them to agents.")
+    parser.add_argument("--file", default=FLEET_FILE, help="fleet schedules file")
+    parser.add_argument("--concurrency", type=int, default=FLEET_MAX_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=FLEET_TIMEOUT)
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("run", help="run the controller (default)")
+    sub.add_parser("list", help="list fleet schedules")
+    add = sub.add_parser("add", help="add a fleet schedule")
+    add.add_argument("when", help="ISO date/time, e.g. 2025-01-31T18:00:00")
+    add.add_argument("--hosts", default="", help="comma separated host[:port] list")
+    add.add_argument("--local-agents", type=int, metavar="N", help="target N local agents (see agent --local)")
+    add.add_argument("--base-port", type=int, default=AGENT_PORT)
+    add.add_argument("--label", default="Scheduled shutdown")
+    add.add_argument("--repeat-days", help="comma separated weekdays (0=Mon); empty string for daily")
+    fire = sub.add_parser("fire", help="dispatch a schedule now")
+    fire.add_argument("id", help="schedule id (prefix is enough)")
+    args = parser.parse_args(argv)
+
+    controller = FleetController(args.file, args.concurrency, args.timeout)
+    controller.load()
+
+    if args.command == "list":
+        for sid, info in controller.schedules.items():
+            state = "on" if info.get("enabled", True) else "off"
+            repeat = f" repeat={info.get('repeat_days') or 'daily'}" if info.get("repeat") else ""
+            print(f"{sid[:8]}  {info['when']}  [{state}]  {len(info.get('hosts', []))} host(s)  {info.get('label', '')}{repeat}")
+    elif args.command == "add":
+        hosts = [h.strip() for h in args.hosts.split(",") if h.strip()]
+        if args.local_agents:
+            from agent import local_addresses
+            hosts += local_addresses(args.local_agents, args.base_port)
+        if not hosts:
+            parser.error("no hosts given")
+        when = datetime.fromisoformat(args.when).isoformat()
+        repeat = args.repeat_days is not None
+        if not repeat and datetime.fromisoformat(when) <= clock.now():
+            parser.error(f"{when} is in the past")
+        repeat_days = [int(d) for d in args.repeat_days.split(",") if d.strip()] if repeat else []
+        sid = controller.add_schedule(when, hosts, args.label, repeat, repeat_days)
+        print(f"[Fleet] Added {sid} for {len(hosts)} host(s) at {when}")
+    elif args.command == "fire":
+        matches = [sid for sid in controller.schedules if sid.startswith(args.id)]
+        if len(matches) != 1:
+            parser.error(f"{len(matches)} schedules match {args.id!r}")
+
+        async def _fire():
+            try:
+                return await controller.dispatch(matches[0])
+            finally:
+                await controller.pool.close()
+        results = asyncio.run(_fire())
+        sys.exit(1 if any(results.values()) else 0)
+    else:
+        try:
+            asyncio.run(controller.run())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
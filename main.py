@@ -1,5 +1,18 @@
-from ui import SchedulerApp
+import sys
 
 if __name__ == "__main__":
-    app = SchedulerApp()
-    app.mainloop()
\ No newline at end of file
+    # headless modes: "controller" dispatches fleet schedules, "agent" receives them,
+    # "simulate" fast-forwards schedules on a virtual clock
+    if len(sys.argv) > 1 and sys.argv[1] == "controller":
+        from fleet import main
+        main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "agent":
+        from agent import main
+        main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        from simulation import main
+        main(sys.argv[2:])
+    else:
+        from ui import SchedulerApp
+        app = SchedulerApp()
+        app.mainloop()
\ No newline at end of file
@@ -8,11 +8,20 @@ from datetime import datetime
 import uuid
 from config import CONFIG_FILE
 
-def load_schedules(app):
+def _warn(app, title, text):
+    # headless apps (fleet controller, agents) have no Tk root to show a dialog on
+    warn = getattr(app, "show_warning", None)
+    if warn:
+        warn(title, text)
+    else:
+        messagebox.showwarning(title, text)
+
+def load_schedules(app, keep_fields=()):
     from config import STORAGE_FILE
-    if os.path.exists(STORAGE_FILE):
+    storage_file = getattr(app, "storage_file", STORAGE_FILE)
+    if storage_file and os.path.exists(storage_file):
         try:
-            with open(STORAGE_FILE, "r", encoding="utf-8") as f:
+            with open(storage_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
                 # validate and load
                 for item in data:
@@ -30,21 +39,41 @@ def load_schedules(app):
                         "repeat": item.get("repeat", False),
                         "repeat_days": item.get("repeat_days", [])
                     }
+                    # extra per-app fields, e.g. "hosts" for fleet schedules
+                    for field in keep_fields:
+                        if field in item:
+                            app.schedules[sid][field] = item[field]
             app.status.configure(text=f"Loaded {len(app.schedules)} scheduled shutdown(s).")
         except Exception as e:
-            messagebox.showwarning("Load error", f"Failed to load schedules: {e}")
+            _warn(app, "Load error", f"Failed to load schedules: {e}")
     else:
         app.schedules = {}
 
-def save_schedules(app):
+def save_schedules(app, raise_errors=False):
     from config import STORAGE_FILE
+    # apps may point at their own file; None keeps schedules in memory only (e.g. fleet agents)
+    storage_file = getattr(app, "storage_file", STORAGE_FILE)
+    if not storage_file:
+        return True
+    # write a temp file and swap it in, so a failed save never leaves a truncated file behind
+    tmp_file = storage_file + ".tmp"
     try:
         to_save = list(app.schedules.values())
-        with open(STORAGE_FILE, "w", encoding="utf-8") as f:
+        with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(to_save, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, storage_file)
         app.status.configure(text="Schedules saved.")
+        return True
     except Exception as e:
-        messagebox.showwarning("Save error", f"Failed to save schedules: {e}")
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        if raise_errors:
+            # the caller reports it, e.g. apply_batch after rolling back
+            raise
+        _warn(app, "Save error", f"Failed to save schedules: {e}")
+        return False
 
 def load_config(app):
     if os.path.exists(CONFIG_FILE):
@@ -1,9 +1,9 @@
-import threading
 import sys
 import subprocess
 from datetime import datetime, timedelta
 from tkinter import messagebox
 from config import SIMULATE_SHUTDOWN
+import clock
 
 def _calculate_next_occurrence(current_dt, repeat_days):
     """
@@ -44,7 +44,7 @@ def get_next_scheduled_datetime(info):
         return None
 
     if info.get("repeat", False):
-        now = datetime.now()
+        now = clock.now()
         if dt > now:
             return dt
         next_dt = _calculate_next_occurrence(dt, info.get("repeat_days", []))
@@ -53,7 +53,10 @@ def get_next_scheduled_datetime(info):
     return dt
 
 
-def schedule_timer_for(app, sid, allow_immediate_for_past=False):
+# simulation.fire_sequence is a copy of the past-time rules in schedule_timer_for,
+# _timer_fired and restore_timers; change it with them (tests/test_simulation.py
+# checks the two still agree).
+def schedule_timer_for(app, sid, allow_immediate_for_past=False, save=True):
     # cancel existing timer if present
     if sid in app.timers:
         try:
@@ -70,7 +73,7 @@ def schedule_timer_for(app, sid, allow_immediate_for_past=False):
         return
 
     dt = datetime.fromisoformat(info["when"])
-    now = datetime.now()
+    now = clock.now()
     delay = (dt - now).total_seconds()
 
     if delay <= 0:
@@ -79,8 +82,9 @@ def schedule_timer_for(app, sid, allow_immediate_for_past=False):
             next_dt = _calculate_next_occurrence(dt, info.get("repeat_days", []))
             if next_dt:
                 info["when"] = next_dt.isoformat()
-                from persistence import save_schedules
-                save_schedules(app)
+                if save:
+                    from persistence import save_schedules
+                    save_schedules(app)
                 dt = next_dt
                 delay = (dt - now).total_seconds()
                 if delay <= 0:
@@ -100,16 +104,101 @@ def schedule_timer_for(app, sid, allow_immediate_for_past=False):
                     del app.schedules[sid]
                 except KeyError:
                     pass
-                from persistence import save_schedules
-                save_schedules(app)
+                if save:
+                    from persistence import save_schedules
+                    save_schedules(app)
                 return
 
-    timer = threading.Timer(delay, _timer_fired, args=(app, sid))
-    timer.daemon = True
-    timer.start()
+    timer = clock.call_later(delay, _timer_fired, app, sid)
     app.timers[sid] = timer
     print(f"[Scheduler] Scheduled {sid} at {dt} (in {delay:.1f}s)")
 
+def _cancel_timer(app, sid):
+    timer = app.timers.pop(sid, None)
+    if timer:
+        try:
+            timer.cancel()
+        except Exception:
+            pass
+
+def apply_batch(app, sids, enabled=None, remove=False, shift=None):
+    """
+    Apply one change to many schedules at once: enable/disable, remove, or shift
+    the time by a timedelta. Every schedule is checked before anything changes, so
+    a ValueError means nothing was touched. Timers are then rebuilt in one pass and
+    the schedules saved once; if that fails, the file is left as it was, the previous
+    schedules and timers are put back and the error is re-raised.
+    Returns (changed_ids, removed_ids).
+    """
+    now = clock.now()
+    staged = {}  # sid -> new info, or None to remove
+    into_past = []
+    for sid in sids:
+        info = app.schedules.get(sid)
+        if not info:
+            continue
+        if remove:
+            staged[sid] = None
+            continue
+        new_info = dict(info)
+        dt = datetime.fromisoformat(new_info["when"])
+        if shift:
+            shifted = dt + shift
+            if shifted <= now and (dt > now or not new_info.get("repeat", False)):
+                # the next run would be skipped; refuse it for repeats and one-time shutdowns alike
+                into_past.append(sid)
+                continue
+            days = (shifted.date() - dt.date()).days
+            if days % 7 and new_info.get("repeat_days"):
+                # crossing midnight moves the weekdays too: Mon 23:30 + 1h runs on Tuesdays at 00:30
+                new_info["repeat_days"] = sorted((day + days) % 7 for day in new_info["repeat_days"])
+            dt = shifted
+        if enabled is not None:
+            new_info["enabled"] = enabled
+        if dt <= now:
+            if new_info.get("repeat", False):
+                # a stale repeat rolls forward to the next occurrence after now instead of firing a catch-up
+                while dt and dt <= now:
+                    dt = _calculate_next_occurrence(dt, new_info.get("repeat_days", []))
+                if not dt:
+                    raise ValueError(f"Schedule {sid[:8]} has no next occurrence.")
+            elif new_info.get("enabled", True):
+                # an expired one-time shutdown cannot be re-enabled, drop it as toggling always did
+                staged[sid] = None
+                continue
+        new_info["when"] = dt.isoformat()
+        staged[sid] = new_info
+    if into_past:
+        ids = ", ".join(sid[:8] for sid in into_past)
+        raise ValueError(f"This would move the next run of {len(into_past)} shutdown(s) into the past ({ids}).")
+
+    previous = {sid: app.schedules[sid] for sid in staged}
+    had_timer = [sid for sid in staged if sid in app.timers]
+    try:
+        for sid, new_info in staged.items():
+            _cancel_timer(app, sid)
+            if new_info is None:
+                del app.schedules[sid]
+            else:
+                app.schedules[sid] = new_info
+        for sid, new_info in staged.items():
+            if new_info is not None:
+                # everything enabled is in the future now, so this only arms timers
+                schedule_timer_for(app, sid, allow_immediate_for_past=False, save=False)
+        from persistence import save_schedules
+        save_schedules(app, raise_errors=True)
+    except Exception:
+        for sid, info in previous.items():
+            _cancel_timer(app, sid)
+            app.schedules[sid] = info
+        for sid in had_timer:
+            schedule_timer_for(app, sid, allow_immediate_for_past=False, save=False)
+        raise
+
+    changed = [sid for sid, new_info in staged.items() if new_info is not None]
+    removed = [sid for sid, new_info in staged.items() if new_info is None]
+    return changed, removed
+
 def _timer_fired(app, sid):
     # called in background thread
     info = app.schedules.get(sid)
@@ -125,24 +214,12 @@ def _timer_fired(app, sid):
     # update UI from main thread
     app.after(0, lambda: app.status.configure(text=msg))
 
-    # perform (simulate by default)
-    if SIMULATE_SHUTDOWN:
-        # simulation: sleep briefly then log
-        print("[Shutdown simulated] device would shut down now (simulation).")
-        app.after(0, lambda: messagebox.showinfo("Simulated shutdown", f"Simulated shutdown executed:\n{label}\n{when}"))
+    # perform (simulate by default); headless apps such as fleet agents may provide their own action
+    perform = getattr(app, "perform_shutdown", None)
+    if perform:
+        perform(sid, label, when)
     else:
-        # real shutdown command for Windows. (Modify for other OS as desired.)
-        try:
-            if sys.platform.startswith("win"):
-                # immediate shutdown
-                subprocess.run(["shutdown", "/s", "/t", "0"], check=False)
-            elif sys.platform.startswith("linux") or sys.platform.startswith("darwin"):
-                # requires sudo privileges; user will need to adjust
-                subprocess.run(["shutdown", "-h", "now"], check=False)
-            else:
-                print("Unsupported OS for auto-shutdown.")
-        except Exception as e:
-            print("Failed to execute shutdown:", e)
+        _perform_shutdown(app, sid, label, when)
 
     # After running, check if repeat
     if info.get("repeat", False):
@@ -170,13 +247,35 @@ def _timer_fired(app, sid):
     save_schedules(app)
     app.after(0, app.refresh_list_for_selected_day)
 
+def _perform_shutdown(app, sid, label, when):
+    if SIMULATE_SHUTDOWN:
+        # simulation: sleep briefly then log
+        print("[Shutdown simulated] device would shut down now (simulation).")
+        app.after(0, lambda: messagebox.showinfo("Simulated shutdown", f"Simulated shutdown executed:\n{label}\n{when}"))
+    else:
+        _run_shutdown_command()
+
+def _run_shutdown_command():
+    # real shutdown command for Windows. (Modify for other OS as desired.)
+    try:
+        if sys.platform.startswith("win"):
+            # immediate shutdown
+            subprocess.run(["shutdown", "/s", "/t", "0"], check=False)
+        elif sys.platform.startswith("linux") or sys.platform.startswith("darwin"):
+            # requires sudo privileges; user will need to adjust
+            subprocess.run(["shutdown", "-h", "now"], check=False)
+        else:
+            print("Unsupported OS for auto-shutdown.")
+    except Exception as e:
+        print("Failed to execute shutdown:", e)
+
 def restore_timers(app):
     # restore active timers on startup for enabled schedules in the future
     count = 0
     for sid, info in list(app.schedules.items()):
         dt = datetime.fromisoformat(info["when"])
         if info.get("enabled", True):
-            if dt > datetime.now() - timedelta(seconds=1):
+            if dt > clock.now() - timedelta(seconds=1):
                 schedule_timer_for(app, sid)
                 count += 1
             else:
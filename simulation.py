@@ -0,0 +1,241 @@
+import argparse
+import contextlib
+import heapq
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+import clock
+from config import STORAGE_FILE
+from scheduler import _calculate_next_occurrence, restore_timers
+
+# ---------- Fast fire sequence ----------
+_gap_cache = {}
+_US = timedelta(microseconds=1)
+_DAY_US = 86400 * 10**6
+_CATCH_UP_US = 100000  # schedule_timer_for retries a still-past repeat after 0.1s
+_RESTORE_GRACE_US = 10**6  # restore_timers keeps anything due within the last second
+
+def _weekday_gaps(repeat_days):
+    """Days until the next fire for each weekday, taken from _calculate_next_occurrence itself."""
+    key = tuple(repeat_days)
+    gaps = _gap_cache.get(key)
+    if gaps is None:
+        monday = datetime(2024, 1, 1)  # any Monday
+        gaps = []
+        for wd in range(7):
+            day = monday + timedelta(days=wd)
+            next_dt = _calculate_next_occurrence(day, list(key))
+            gaps.append(None if next_dt is None else (next_dt - day).days)
+        _gap_cache[key] = gaps
+    return gaps
+
+
+def fire_sequence(schedules, start, end):
+    """
+    Return the (datetime, sid) fires that replay() records between start and end,
+    in the same order, without going through timers or persistence.
+    This models restore_timers, schedule_timer_for and _timer_fired step by step:
+    a past repeat moves forward one occurrence per step and fires 0.1s later if
+    it is still in the past, past one-time schedules are dropped, and timers due
+    at the same moment run in the order they were created.
+    """
+    heap = []
+    sids = []
+    whens = []  # per schedule: "when" in microseconds after start
+    when_dts = []  # the same "when" as a datetime
+    weekdays = []
+    gap_table = []  # None for one-time schedules
+    seq = 0
+
+    # restore_timers at start
+    for sid, info in schedules.items():
+        if not info.get("enabled", True):
+            continue
+        try:
+            dt = datetime.fromisoformat(info["when"])
+        except Exception:
+            continue
+        gaps = _weekday_gaps(info.get("repeat_days", [])) if info.get("repeat", False) else None
+        when = (dt - start) // _US
+        wd = dt.weekday()
+        if when <= -_RESTORE_GRACE_US:
+            if gaps is None or gaps[wd] is None:
+                continue
+            dt += timedelta(days=gaps[wd])
+            when += gaps[wd] * _DAY_US
+            wd = (wd + gaps[wd]) % 7
+        # schedule_timer_for at start
+        if when > 0:
+            due, due_dt = when, dt
+        elif gaps is None or gaps[wd] is None:
+            continue
+        else:
+            dt += timedelta(days=gaps[wd])
+            when += gaps[wd] * _DAY_US
+            wd = (wd + gaps[wd]) % 7
+            if when > 0:
+                due, due_dt = when, dt
+            else:
+                due, due_dt = _CATCH_UP_US, start + timedelta(microseconds=_CATCH_UP_US)
+        idx = len(sids)
+        sids.append(sid)
+        whens.append(when)
+        when_dts.append(dt)
+        weekdays.append(wd)
+        gap_table.append(gaps)
+        seq += 1
+        heap.append((due, seq, idx, due_dt))
+    heapq.heapify(heap)
+
+    # _timer_fired for each due timer, which re-arms repeats through schedule_timer_for.
+    # Heap order uses the integer times; datetimes are built alongside by adding
+    # ready-made day steps, which is far cheaper than converting every fire.
+    day_steps = [timedelta(days=d) for d in range(15)]
+    catch_up = timedelta(microseconds=_CATCH_UP_US)
+    limit = (end - start) // _US
+    fired = []
+    append = fired.append
+    heappop, heapreplace = heapq.heappop, heapq.heapreplace
+    while heap and heap[0][0] < limit:
+        # peek, then either drop the timer or replace it with the re-armed one in a single sift
+        now, _, idx, now_dt = heap[0]
+        append((now_dt, sids[idx]))
+        gaps = gap_table[idx]
+        wd = weekdays[idx]
+        gap = None if gaps is None else gaps[wd]
+        if gap is None:
+            heappop(heap)
+            continue
+        when = whens[idx] + gap * _DAY_US
+        when_dt = when_dts[idx] + (day_steps[gap] if gap < 15 else timedelta(days=gap))
+        wd = (wd + gap) % 7
+        if when <= now:
+            gap = gaps[wd]
+            if gap is None:
+                heappop(heap)
+                continue
+            when += gap * _DAY_US
+            when_dt += day_steps[gap] if gap < 15 else timedelta(days=gap)
+            wd = (wd + gap) % 7
+            if when > now:
+                due, due_dt = when, when_dt
+            else:
+                due, due_dt = now + _CATCH_UP_US, now_dt + catch_up
+        else:
+            due, due_dt = when, when_dt
+        whens[idx] = when
+        when_dts[idx] = when_dt
+        weekdays[idx] = wd
+        seq += 1
+        heapreplace(heap, (due, seq, idx, due_dt))
+    return fired
+
+
+# ---------- Replay through the real scheduler ----------
+class _SilentStatus:
+    def configure(self, text=""):
+        pass
+
+
+class _NullWriter:
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+class SimulatedApp:
+    """Headless app that records fires instead of shutting down; schedules stay in memory."""
+
+    def __init__(self, schedules):
+        self.schedules = {sid: dict(info) for sid, info in schedules.items()}
+        self.timers = {}
+        self.storage_file = None
+        self.status = _SilentStatus()
+        self.fires = []
+
+    def after(self, ms, func):
+        func()
+
+    def refresh_list_for_selected_day(self):
+        pass
+
+    def perform_shutdown(self, sid, label, when):
+        self.fires.append((clock.now(), sid))
+
+
+def replay(schedules, start, end):
+    """
+    Run restore_timers/_timer_fired against a virtual clock from start to end and
+    return the recorded (datetime, sid) fires. Slower than fire_sequence, but it is
+    the scheduler's own code path, including how it catches up on past schedules.
+    """
+    app = SimulatedApp(schedules)
+    virtual = clock.VirtualClock(start)
+    previous = clock.set_clock(virtual)
+    try:
+        with contextlib.redirect_stdout(_NullWriter()):
+            restore_timers(app)
+            virtual.run_until(end)
+    finally:
+        clock.set_clock(previous)
+    return app.fires
+
+
+def synthetic_schedules(count, start, seed=0):
+    """Random mix of one-time, daily and weekday schedules for throughput runs."""
+    rng = random.Random(seed)
+    schedules = {}
+    for i in range(count):
+        sid = str(uuid.UUID(int=rng.getrandbits(128)))
+        when = start + timedelta(days=rng.randrange(7), seconds=rng.randrange(86400))
+        kind = rng.random()
+        repeat = kind >= 0.1
+        repeat_days = [] if kind < 0.4 else sorted(rng.sample(range(7), rng.randint(1, 5)))
+        schedules[sid] = {
+            "id": sid,
+            "when": when.isoformat(),
+            "label": f"Synthetic {i}",
+            "enabled": True,
+            "repeat": repeat,
+            "repeat_days": repeat_days if repeat else []
+        }
+    return schedules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="simulate", description="Fast-forward schedules on a virtual clock and print the fires.")
+    parser.add_argument("--file", default=STORAGE_FILE, help="schedules file (defaults to the app's own)")
+    parser.add_argument("--start", help="ISO start time (default: now)")
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--synthetic", type=int, metavar="N", help="use N generated schedules instead of --file")
+    parser.add_argument("--replay", action="store_true", help="drive the real scheduler code instead of the fast engine")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+
+    start = datetime.fromisoformat(args.start) if args.start else clock.now().replace(microsecond=0)
+    end = start + timedelta(days=args.days)
+    if args.synthetic:
+        schedules = synthetic_schedules(args.synthetic, start)
+    else:
+        with open(args.file, "r", encoding="utf-8") as f:
+            schedules = {item["id"]: item for item in json.load(f) if item.get("id")}
+
+    t0 = time.perf_counter()
+    fires = replay(schedules, start, end) if args.replay else fire_sequence(schedules, start, end)
+    elapsed = time.perf_counter() - t0
+
+    if not args.quiet:
+        out = sys.stdout
+        for dt, sid in fires:
+            out.write(f"{dt.isoformat()}  {sid}  {schedules[sid].get('label', '')}\n")
+    rate = len(fires) / elapsed if elapsed else float("inf")
+    print(f"[Simulation] {len(fires)} fires of {len(schedules)} schedule(s) from {start} to {end} in {elapsed:.3f}s ({rate:,.0f} fires/s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
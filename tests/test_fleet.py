@@ -0,0 +1,162 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime
+import clock
+from agent import run_local_agents
+from fleet import FleetController
+
+
+async def _wait_for(condition, timeout=10.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _request(port, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(payload + b"\n")
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    writer.close()
+    return reply
+
+
+def _port(server):
+    return server.sockets[0].getsockname()[1]
+
+
+def test_dispatch_reaches_every_local_agent(tmp_path):
+    async def scenario():
+        agents = await run_local_agents(50, base_port=0, token="secret")
+        controller = FleetController(str(tmp_path / "fleet.json"), max_concurrency=8, token="secret")
+        try:
+            hosts = [f"127.0.0.1:{_port(server)}" for server, _ in agents]
+            sid = controller.add_schedule("2030-01-01T18:00:00", hosts)
+            results = await controller.dispatch(sid)
+            assert all(error is None for error in results.values())
+            apps = [app for _, app in agents]
+            await _wait_for(lambda: all(app.executed for app in apps))
+            assert all(app.executed == [(sid, "2030-01-01T18:00:00")] for app in apps)
+
+            # a resent fire for the same occurrence is acknowledged but not run again
+            await controller.dispatch(sid)
+            await asyncio.sleep(0.1)
+            assert all(len(app.executed) == 1 for app in apps)
+        finally:
+            await controller.pool.close()
+            for server, _ in agents:
+                server.close()
+    asyncio.run(scenario())
+
+
+def test_agent_rejects_bad_requests():
+    async def scenario():
+        [(server, app)] = await run_local_agents(1, base_port=0, token="secret")
+        port = _port(server)
+        try:
+            assert not (await _request(port, b"[]"))["ok"]
+            assert not (await _request(port, b"not json"))["ok"]
+            assert not (await _request(port, b'{"op": "fire", "token": "secret"}'))["ok"]
+            assert not (await _request(port, b'{"op": "fire", "id": "x", "token": "wrong"}'))["ok"]
+            assert (await _request(port, b'{"op": "ping", "token": "secret"}'))["ok"]
+            assert app.executed == [] and app.schedules == {}
+        finally:
+            server.close()
+    asyncio.run(scenario())
+
+
+def test_save_keeps_schedules_added_while_running(tmp_path):
+    path = str(tmp_path / "fleet.json")
+    running = FleetController(path)
+    first = running.add_schedule("2030-01-01T18:00:00", ["pc1"])
+    running.load()
+
+    # another "controller add" process writes to the same file
+    other = FleetController(path)
+    other.load()
+    second = other.add_schedule("2030-01-02T18:00:00", ["pc2"])
+
+    running._advance(first)  # one-shot fired and finished
+    running.save()
+    saved = FleetController(path)
+    saved.load()
+    assert list(saved.schedules) == [second]
+    assert saved.schedules[second]["hosts"] == ["pc2"]
+
+
+def test_controller_that_fell_behind_fires_once_then_skips_ahead(tmp_path):
+    async def scenario():
+        [(server, app)] = await run_local_agents(1, base_port=0, token="secret")
+        controller = FleetController(str(tmp_path / "fleet.json"), token="secret")
+        try:
+            # a daily repeat last fired five days ago, e.g. after the controller box was suspended
+            sid = controller.add_schedule("2025-01-27T18:00:00", [f"127.0.0.1:{_port(server)}"], repeat=True)
+            await controller.tick()
+            await controller.tick()
+            await _wait_for(lambda: app.executed)
+            await asyncio.sleep(0.1)
+            assert app.executed == [(sid, "2025-01-27T18:00:00")]
+            assert controller.schedules[sid]["when"] == "2025-02-01T18:00:00"
+        finally:
+            await controller.pool.close()
+            server.close()
+
+    previous = clock.set_clock(clock.VirtualClock(datetime(2025, 2, 1, 9, 0)))
+    try:
+        asyncio.run(scenario())
+    finally:
+        clock.set_clock(previous)
+
+
+def test_past_schedules_picked_up_while_running_are_not_fired(tmp_path):
+    async def scenario():
+        [(server, app)] = await run_local_agents(1, base_port=0, token="secret")
+        path = str(tmp_path / "fleet.json")
+        running = FleetController(path, token="secret")
+        try:
+            running.restore()
+            hosts = [f"127.0.0.1:{_port(server)}"]
+            other = FleetController(path)
+            other.load()
+            one_time = other.add_schedule("2025-01-31T18:00:00", hosts)
+            weekdays = other.add_schedule("2025-01-31T18:00:00", hosts, repeat=True, repeat_days=[0, 1, 2, 3, 4])
+
+            assert await running.tick() > 0
+            await asyncio.sleep(0.1)
+            assert app.executed == []
+            assert one_time not in running.schedules
+            assert running.schedules[weekdays]["when"] == "2025-02-03T18:00:00"
+        finally:
+            await running.pool.close()
+            server.close()
+
+    previous = clock.set_clock(clock.VirtualClock(datetime(2025, 2, 1, 9, 0)))
+    try:
+        asyncio.run(scenario())
+    finally:
+        clock.set_clock(previous)
+
+
+def test_agent_never_uses_the_tk_dialog_and_logs_failures(monkeypatch, capsys):
+    import agent
+    monkeypatch.setattr(agent, "SIMULATE_SHUTDOWN", True)
+    monkeypatch.setattr(agent, "_run_shutdown_command", lambda: pytest.fail("real shutdown on a simulated agent"))
+    app = agent.HeadlessApp(name="pc1", token="secret")
+    app.perform_shutdown("a" * 36, "Nightly", "2030-01-01T18:00:00")
+    assert app.executed == [("a" * 36, "2030-01-01T18:00:00")]
+
+    async def scenario():
+        [(server, broken)] = await run_local_agents(1, base_port=0, token="secret")
+
+        def fail(sid, label, when):
+            raise OSError("shutdown not permitted")
+        broken.perform_shutdown = fail
+        try:
+            await _request(_port(server), b'{"op": "fire", "id": "b", "when": "w", "token": "secret"}')
+            await _wait_for(lambda: "shutdown not permitted" in capsys.readouterr().out)
+        finally:
+            server.close()
+    asyncio.run(scenario())
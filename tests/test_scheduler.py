@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+import pytest
+import clock
+from scheduler import apply_batch, restore_timers
+from simulation import SimulatedApp
+
+NOW = datetime(2026, 1, 5, 12, 0)  # a Monday
+
+
+@pytest.fixture
+def virtual_clock():
+    virtual = clock.VirtualClock(NOW)
+    previous = clock.set_clock(virtual)
+    yield virtual
+    clock.set_clock(previous)
+
+
+def _schedule(sid, when, repeat=False, enabled=True, repeat_days=()):
+    return {"id": sid, "when": when.isoformat(), "label": sid, "enabled": enabled,
+            "repeat": repeat, "repeat_days": list(repeat_days)}
+
+
+def _app(*schedules):
+    app = SimulatedApp({info["id"]: info for info in schedules})
+    restore_timers(app)
+    return app
+
+
+def test_shift_rolls_stale_repeat_forward_without_firing(virtual_clock):
+    app = _app(_schedule("daily", NOW.replace(hour=18) - timedelta(days=3), repeat=True, enabled=False))
+    changed, removed = apply_batch(app, ["daily"], shift=timedelta(minutes=60))
+    assert (changed, removed) == (["daily"], [])
+    assert app.schedules["daily"]["when"] == NOW.replace(hour=19).isoformat()
+    virtual_clock.run_until(NOW + timedelta(hours=1))
+    assert app.fires == []
+
+
+def test_shift_that_skips_next_repeat_is_rejected(virtual_clock):
+    app = _app(_schedule("daily", NOW.replace(hour=18), repeat=True))
+    with pytest.raises(ValueError):
+        apply_batch(app, ["daily"], shift=timedelta(minutes=-4320))
+    assert app.schedules["daily"]["when"] == NOW.replace(hour=18).isoformat()
+    virtual_clock.run_until(NOW + timedelta(hours=1))
+    assert app.fires == []
+
+
+def test_shift_across_midnight_moves_weekdays(virtual_clock):
+    app = _app(_schedule("monday", NOW.replace(hour=23, minute=30), repeat=True, repeat_days=[0]))
+    apply_batch(app, ["monday"], shift=timedelta(minutes=60))
+    assert app.schedules["monday"]["repeat_days"] == [1]
+    virtual_clock.run_until(NOW + timedelta(days=14))
+    tuesday = datetime(2026, 1, 6, 0, 30)
+    assert app.fires == [(tuesday, "monday"), (tuesday + timedelta(days=7), "monday")]
+
+
+def test_shift_into_past_rejects_whole_batch(virtual_clock):
+    app = _app(_schedule("daily", NOW.replace(hour=18), repeat=True),
+               _schedule("once", NOW + timedelta(hours=2)))
+    before = {sid: dict(info) for sid, info in app.schedules.items()}
+    timers = dict(app.timers)
+    with pytest.raises(ValueError):
+        apply_batch(app, ["daily", "once"], shift=timedelta(hours=-3))
+    assert app.schedules == before
+    assert app.timers == timers
+
+
+def test_enable_reports_expired_one_time_as_removed(virtual_clock):
+    app = _app(_schedule("old", NOW - timedelta(days=1), enabled=False),
+               _schedule("later", NOW + timedelta(hours=1), enabled=False))
+    changed, removed = apply_batch(app, ["old", "later"], enabled=True)
+    assert (changed, removed) == (["later"], ["old"])
+    assert list(app.schedules) == ["later"] and list(app.timers) == ["later"]
+
+
+def test_failed_save_restores_previous_state(virtual_clock, monkeypatch, tmp_path):
+    import persistence
+    app = _app(_schedule("a", NOW + timedelta(hours=1)), _schedule("b", NOW + timedelta(hours=2)))
+    app.storage_file = str(tmp_path / "schedules.json")
+    persistence.save_schedules(app)
+    with open(app.storage_file, encoding="utf-8") as f:
+        on_disk = f.read()
+    before = {sid: dict(info) for sid, info in app.schedules.items()}
+    warnings = []
+    monkeypatch.setattr(persistence, "_warn", lambda app, title, text: warnings.append(title))
+
+    def failing_dump(obj, f, **kwargs):
+        f.write("[")
+        raise OSError("disk full")
+    monkeypatch.setattr(persistence.json, "dump", failing_dump)
+    with pytest.raises(OSError):
+        apply_batch(app, ["a", "b"], remove=True)
+    assert app.schedules == before
+    assert sorted(app.timers) == ["a", "b"]
+    with open(app.storage_file, encoding="utf-8") as f:
+        assert f.read() == on_disk
+    assert warnings == []  # the caller shows the single error dialog
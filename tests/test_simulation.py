@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+from simulation import fire_sequence, replay, synthetic_schedules
+
+START = datetime(2026, 1, 1, 9, 30)
+
+
+def _mixed_schedules():
+    # generated 40 days back, so many repeats are stale and get caught up on start
+    schedules = synthetic_schedules(150, START - timedelta(days=40), seed=7)
+    items = list(schedules.values())
+    for info in items[:10]:
+        info["enabled"] = False
+    # exact ties across different repeat patterns, and one-time schedules in the restore grace second
+    for i, info in enumerate(items[10:20]):
+        info["when"] = (START + timedelta(hours=8)).isoformat()
+        info["repeat"] = i % 3 != 0
+        info["repeat_days"] = [] if i % 2 else [0, 2, 4]
+    items[20]["when"] = (START - timedelta(milliseconds=500)).isoformat()
+    items[21]["when"] = START.isoformat()
+    return schedules
+
+
+def test_fire_sequence_matches_scheduler_replay():
+    schedules = _mixed_schedules()
+    end = START + timedelta(days=120)
+    fast = fire_sequence(schedules, START, end)
+    assert fast == replay(schedules, START, end)
+    # stale repeats produce catch-up fires shortly after start
+    assert any(dt == START + timedelta(seconds=0.1) for dt, _ in fast)
+
+
+def test_fire_sequence_leaves_schedules_untouched():
+    schedules = _mixed_schedules()
+    before = {sid: dict(info) for sid, info in schedules.items()}
+    fire_sequence(schedules, START, START + timedelta(days=30))
+    replay(schedules, START, START + timedelta(days=30))
+    assert schedules == before
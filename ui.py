@@ -5,8 +5,9 @@ from tkinter import messagebox
 from datetime import datetime, timedelta
 import uuid
 import os
+import clock
 from persistence import load_schedules, save_schedules, load_config, save_config, toggle_startup
-from scheduler import schedule_timer_for, restore_timers, get_next_scheduled_datetime
+from scheduler import schedule_timer_for, restore_timers, get_next_scheduled_datetime, apply_batch
 from tray import create_tray_icon, hide_window, show_window, exit_app
 
 ctk.set_appearance_mode("System")
@@ -63,7 +64,7 @@ class SchedulerApp(ctk.CTk):
         self.calendar.grid(row=1, column=0, padx=10, pady=6)
 
         # Highlight current day explicitly
-        today = datetime.now().date()
+        today = clock.now().date()
         self.calendar.tag_config('today_tag', background='#8B0000', foreground='white')
         self.calendar.calevent_create(today, 'Today', 'today_tag')
 
@@ -80,7 +81,7 @@ class SchedulerApp(ctk.CTk):
         lbl2 = ctk.CTkLabel(right_frame, text="Scheduled shutdowns", font=ctk.CTkFont(size=16, weight="bold"))
         lbl2.grid(row=0, column=0, pady=(10,6), sticky="w", padx=10)
 
-        self.listbox = tk.Listbox(right_frame, height=14, activestyle="none", selectmode=tk.SINGLE)
+        self.listbox = tk.Listbox(right_frame, height=12, activestyle="none", selectmode=tk.EXTENDED)
         self.listbox.grid(row=1, column=0, padx=(10,0), pady=6, sticky="nsew")
 
         scrollbar = tk.Scrollbar(right_frame, command=self.listbox.yview)
@@ -91,9 +92,11 @@ class SchedulerApp(ctk.CTk):
         btn_frame.grid(row=2, column=0, pady=8, padx=10, sticky="ew")
         btn_frame.grid_columnconfigure((0,1,2), weight=1)
 
-        ctk.CTkButton(btn_frame, text="Enable/Disable", command=self.toggle_selected).grid(row=0, column=0, padx=4)
-        ctk.CTkButton(btn_frame, text="Remove", fg_color="#b22222", hover_color="#ff3333", command=self.remove_selected).grid(row=0, column=1, padx=4)
-        ctk.CTkButton(btn_frame, text="Next scheduled", command=self.show_next_scheduled).grid(row=0, column=2, padx=4)
+        ctk.CTkButton(btn_frame, text="Enable", command=lambda: self.set_selected_enabled(True)).grid(row=0, column=0, padx=4)
+        ctk.CTkButton(btn_frame, text="Disable", command=lambda: self.set_selected_enabled(False)).grid(row=0, column=1, padx=4)
+        ctk.CTkButton(btn_frame, text="Remove", fg_color="#b22222", hover_color="#ff3333", command=self.remove_selected).grid(row=0, column=2, padx=4)
+        ctk.CTkButton(btn_frame, text="Shift time", command=self.shift_selected).grid(row=1, column=0, padx=4, pady=(6,0))
+        ctk.CTkButton(btn_frame, text="Next scheduled", command=self.show_next_scheduled).grid(row=1, column=1, padx=4, pady=(6,0))
 
         self.status = ctk.CTkLabel(self, text="Ready", anchor="w")
         self.status.grid(row=1, column=0, columnspan=2, sticky="ew", padx=12, pady=(0,8))
@@ -108,7 +111,7 @@ class SchedulerApp(ctk.CTk):
         selected_weekday = selected_date.weekday()  # 0=Mon, 6=Sun
         
         items = []
-        now = datetime.now()
+        now = clock.now()
         for sid, info in self.schedules.items():
             next_dt = get_next_scheduled_datetime(info)
             if next_dt and next_dt <= now:
@@ -157,21 +160,21 @@ class SchedulerApp(ctk.CTk):
             display = f"{enabled_mark} {dt.strftime('%H:%M:%S')}  — {label}{repeat_info}  (id={sid[:8]})"
             self.listbox.insert(tk.END, display)
 
-    def get_selected_schedule_id(self):
-        sel = self.listbox.curselection()
-        if not sel:
-            return None
-        display = self.listbox.get(sel[0])
-        # parse id from display (id=xxxx)
-        try:
-            sid_short = display.split("id=")[1].strip(")")
+    def get_selected_schedule_ids(self):
+        ids = []
+        for index in self.listbox.curselection():
+            display = self.listbox.get(index)
+            # parse id from display (id=xxxx)
+            try:
+                sid_short = display.split("id=")[1].strip(")")
+            except Exception:
+                continue
             # find schedule that startswith sid_short
             for sid in self.schedules:
                 if sid.startswith(sid_short):
-                    return sid
-        except Exception:
-            return None
-        return None
+                    ids.append(sid)
+                    break
+        return ids
 
     # ---------- Time popup ----------
     def open_time_popup(self):
@@ -195,50 +198,63 @@ class SchedulerApp(ctk.CTk):
         self.refresh_list_for_selected_day()
 
     # ---------- Controls for selected ----------
-    def toggle_selected(self):
-        sid = self.get_selected_schedule_id()
-        if not sid:
-            messagebox.showinfo("Select", "Please select a shutdown item from the list.")
+    def _selected_or_warn(self):
+        sids = self.get_selected_schedule_ids()
+        if not sids:
+            messagebox.showinfo("Select", "Please select one or more shutdown items from the list.")
+        return sids
+
+    def _apply_to_selected(self, sids, **changes):
+        # one transaction: a single save, timer rebuild and list refresh for the whole selection
+        try:
+            changed, removed = apply_batch(self, sids, **changes)
+        except ValueError as e:
+            messagebox.showwarning("Batch error", f"No changes were made: {e}")
             return
-        info = self.schedules.get(sid)
-        if not info:
+        except Exception as e:
+            messagebox.showwarning("Batch error", f"The changes were rolled back: {e}")
+            self.refresh_list_for_selected_day()
             return
-        info["enabled"] = not info.get("enabled", True)
-        if info["enabled"]:
-            schedule_timer_for(self, sid, allow_immediate_for_past=False)
-        else:
-            # cancel timer
-            if sid in self.timers:
-                try:
-                    self.timers[sid].cancel()
-                except Exception:
-                    pass
-                del self.timers[sid]
-        save_schedules(self)
         self.refresh_list_for_selected_day()
+        summary = []
+        if changed:
+            summary.append(f"updated {len(changed)}")
+        if removed:
+            summary.append(f"removed {len(removed)}")
+        self.status.configure(text=f"Scheduled shutdowns: {', '.join(summary) or 'nothing changed'}.")
+        expired = [sid for sid in removed if not changes.get("remove")]
+        if expired:
+            messagebox.showinfo("Expired", f"{len(expired)} one-time shutdown(s) were already in the past and have been removed.")
+
+    def set_selected_enabled(self, enabled):
+        sids = self._selected_or_warn()
+        if sids:
+            self._apply_to_selected(sids, enabled=enabled)
 
     def remove_selected(self):
-        sid = self.get_selected_schedule_id()
-        if not sid:
-            messagebox.showinfo("Select", "Please select a shutdown item from the list.")
+        sids = self._selected_or_warn()
+        if not sids:
             return
-        if messagebox.askyesno("Confirm", "Remove the selected scheduled shutdown?"):
-            # cancel timer
-            if sid in self.timers:
-                try:
-                    self.timers[sid].cancel()
-                except Exception:
-                    pass
-                del self.timers[sid]
-            try:
-                del self.schedules[sid]
-            except KeyError:
-                pass
-            save_schedules(self)
-            self.refresh_list_for_selected_day()
+        if messagebox.askyesno("Confirm", f"Remove the {len(sids)} selected scheduled shutdown(s)?"):
+            self._apply_to_selected(sids, remove=True)
+
+    def shift_selected(self):
+        sids = self._selected_or_warn()
+        if not sids:
+            return
+        dialog = ctk.CTkInputDialog(text="Shift the selected shutdowns by how many minutes?\n(negative moves them earlier)", title="Shift time")
+        value = dialog.get_input()
+        if value is None or not value.strip():
+            return
+        try:
+            minutes = float(value)
+        except ValueError:
+            messagebox.showwarning("Invalid", f"Invalid number of minutes: {value}")
+            return
+        self._apply_to_selected(sids, shift=timedelta(minutes=minutes))
 
     def show_next_scheduled(self):
-        now = datetime.now()
+        now = clock.now()
         best = None
         best_sid = None
         for sid, info in self.schedules.items():
@@ -348,7 +364,7 @@ class TimePopup(ctk.CTkToplevel):
             mm = int(self.min_var.get())
             ss = int(self.sec_var.get())
             dt = datetime.fromisoformat(self.date_str + "T00:00:00").replace(hour=hh, minute=mm, second=ss)
-            if dt < datetime.now():
+            if dt < clock.now():
                 if not messagebox.askyesno("Past time", "Selected time is in the past. Add anyway (it will run immediately)?"):
                     return
             iso = dt.isoformat()